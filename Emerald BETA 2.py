@@ -11,7 +11,7 @@ from typing import Dict, List, Optional
 from enum import Enum
 from collections import deque
 from contextlib import suppress
-from functools import partial
+from functools import partial, cached_property
 from concurrent.futures import ThreadPoolExecutor
 import random
 
@@ -59,6 +59,7 @@ class Config:
     ENABLE_CONSOLE_MODE = True
     CONSOLE_REFRESH_RATE = 1
     CONSOLE_EPHEMERAL = True
+    PLAYBACK_STATE_TTL = 0.25 # seconds the web dashboard may reuse is_playing/is_paused
     ENABLE_CROSSFADE = True
     CROSSFADE_DURATION = 6.0
     
@@ -105,6 +106,8 @@ class YTDLConfig:
     }
 
 ytdl = yt_dlp.YoutubeDL(YTDLConfig.OPTIONS)
+# Shared like ytdl so playlist lookups reuse its HTTP connections and cookies
+ytdl_flat = yt_dlp.YoutubeDL({**YTDLConfig.OPTIONS, 'extract_flat': 'in_playlist'})
 ytmusic = YTMusic()
 
 # ================== Enums ==================
@@ -216,6 +219,20 @@ class AudioSource:
         self.is_downloaded = False
         self.download_task = None
 
+    @cached_property
+    def _dict(self):
+        return {
+            'title': self.title,
+            'url': self.url,
+            'uploader': self.uploader,
+            'duration': self.duration,
+            'thumbnail': self.thumbnail
+        }
+
+    def as_dict(self):
+        """Song metadata for the web dashboard (built once, don't mutate)"""
+        return self._dict
+
     @classmethod
     async def create_source(cls, ctx, search: str, *, loop=None, download=True, is_playlist=False):
         loop = loop or asyncio.get_event_loop()
@@ -228,7 +245,6 @@ class AudioSource:
         
         try:
             if is_playlist or ('playlist' in search.lower() or 'list=' in search):
-                ytdl_flat = yt_dlp.YoutubeDL({**YTDLConfig.OPTIONS, 'extract_flat': 'in_playlist'})
                 data = await loop.run_in_executor(None, partial(ytdl_flat.extract_info, search, download=False))
                 
                 if not data:
@@ -364,11 +380,19 @@ class MusicPlayer:
         self.queue: deque = deque()
         self.history: deque = deque(maxlen=50)
         self.current: Optional[AudioSource] = None
-        self.loop_mode = LoopMode.NONE
+        self._loop_mode = LoopMode.NONE
         self.volume = Config.DEFAULT_VOLUME
         self.guild_id = voice_client.guild.id
+        self._guild_id_str = str(self.guild_id)
         self._task = None
         self._event = asyncio.Event()
+        
+        # Change hooks (e.g. the web dashboard); called with this player
+        self.on_state_change = None
+        self.on_queue_change = None
+        self._playback_state = (False, False)
+        self._playback_state_ts = 0.0
+        
         self.state = PlaybackState.IDLE
         self.preload_tasks = []
         self.download_executor = ThreadPoolExecutor(max_workers=Config.MAX_DOWNLOAD_WORKERS)
@@ -378,13 +402,13 @@ class MusicPlayer:
         self.console_task = None
         
         # Crossfade
-        self.crossfade_enabled = Config.ENABLE_CROSSFADE
+        self._crossfade_enabled = Config.ENABLE_CROSSFADE
         self.crossfade_duration = Config.CROSSFADE_DURATION
         self.next_source_ready = None
         self.crossfade_task = None
         
         # Radio
-        self.radio_mode = False
+        self._radio_mode = False
         self.radio_seed_video_id = None
         self.radio_task = None
         
@@ -394,6 +418,71 @@ class MusicPlayer:
         self.bg_idle_task = None
         self.is_bg_playing = False
 
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        changed = getattr(self, '_state', None) != value
+        self._state = value
+        if changed:
+            self.notify_state_change()
+
+    # Settings the dashboard shows; like state, changing one notifies the hooks
+    # wherever it's changed from (commands, buttons or the web API)
+    @property
+    def loop_mode(self):
+        return self._loop_mode
+
+    @loop_mode.setter
+    def loop_mode(self, value):
+        changed = self._loop_mode != value
+        self._loop_mode = value
+        if changed:
+            self.notify_state_change()
+
+    @property
+    def radio_mode(self):
+        return self._radio_mode
+
+    @radio_mode.setter
+    def radio_mode(self, value):
+        changed = self._radio_mode != value
+        self._radio_mode = value
+        if changed:
+            self.notify_state_change()
+
+    @property
+    def crossfade_enabled(self):
+        return self._crossfade_enabled
+
+    @crossfade_enabled.setter
+    def crossfade_enabled(self, value):
+        changed = self._crossfade_enabled != value
+        self._crossfade_enabled = value
+        if changed:
+            self.notify_state_change()
+
+    @property
+    def playback_state(self):
+        """(is_playing, is_paused) of the voice client, cached briefly"""
+        now = time.monotonic()
+        if now - self._playback_state_ts >= Config.PLAYBACK_STATE_TTL:
+            vc = self.voice_client
+            self._playback_state = (vc.is_playing(), vc.is_paused()) if vc else (False, False)
+            self._playback_state_ts = now
+        return self._playback_state
+
+    def notify_state_change(self):
+        self._playback_state_ts = 0.0
+        if self.on_state_change:
+            self.on_state_change(self)
+
+    def notify_queue_change(self):
+        if self.on_queue_change:
+            self.on_queue_change(self)
+
     async def start(self):
         if not self._task or self._task.done():
             self._task = asyncio.create_task(self.player_loop())
@@ -516,6 +605,7 @@ class MusicPlayer:
                         None, lambda: ytmusic.get_watch_playlist(videoId=seed, limit=25)
                     )
                     
+                    added = False
                     for track in playlist.get('tracks', [])[:Config.RADIO_PRELOAD]:
                         vid = track.get('videoId')
                         if vid and vid not in played_ids and not any(s.video_id == vid for s in self.queue):
@@ -526,7 +616,10 @@ class MusicPlayer:
                             )
                             if sources:
                                 self.queue.append(sources[0])
+                                added = True
                     
+                    if added:
+                        self.notify_queue_change()
                     await self.preload_songs()
                 
                 await asyncio.sleep(2)
@@ -1038,6 +1131,7 @@ class MusicPlayer:
                     added.append(song)
         
         if added:
+            self.notify_queue_change()
             limit = Config.RADIO_PRELOAD if self.radio_mode else Config.PRELOAD_COUNT
             for song in list(self.queue)[:limit]:
                 if not song.is_downloaded and not song.download_task:
@@ -1054,9 +1148,11 @@ class MusicPlayer:
             for _ in range(to_position - 2):
                 if self.queue:
                     self.queue.popleft()
+            self.notify_queue_change()
         
         if self.voice_client.is_playing():
             self.voice_client.stop()
+        self._playback_state_ts = 0.0
     
     def pause(self):
         if self.voice_client.is_playing():
@@ -1072,16 +1168,19 @@ class MusicPlayer:
         self.volume = max(0.0, min(1.0, volume))
         if self.voice_client.source and hasattr(self.voice_client.source, 'volume'):
             self.voice_client.source.volume = self.volume
+        self.notify_state_change()
     
     def shuffle(self):
         temp = list(self.queue)
         random.shuffle(temp)
         self.queue = deque(temp)
+        self.notify_queue_change()
     
     def clear_queue(self):
         self.queue.clear()
         if self.radio_mode:
             self.disable_radio_mode()
+        self.notify_queue_change()
 
 # ================== Session Manager ==================
 class SessionManager:
@@ -1089,12 +1188,18 @@ class SessionManager:
         self.sessions: Dict[int, MusicPlayer] = {}
         self.bot = bot_instance
         self.bg_manager = bg_manager
+        # Hooks copied onto every new player (see MusicPlayer)
+        self.on_state_change = None
+        self.on_queue_change = None
     
     async def create_session(self, ctx, voice_client):
         player = MusicPlayer(ctx, voice_client, self.bg_manager)
         player.bot = self.bot
+        player.on_state_change = self.on_state_change
+        player.on_queue_change = self.on_queue_change
         self.sessions[ctx.guild.id] = player
         await player.start()
+        player.notify_state_change()
         return player
     
     def get_session(self, guild_id: int) -> Optional[MusicPlayer]:
@@ -1102,8 +1207,10 @@ class SessionManager:
     
     async def destroy_session(self, guild_id: int):
         if guild_id in self.sessions:
-            await self.sessions[guild_id].stop()
+            player = self.sessions[guild_id]
+            await player.stop()
             del self.sessions[guild_id]
+            player.notify_state_change()
     
     async def cleanup_all(self):
         for guild_id in list(self.sessions.keys()):
@@ -0,0 +1,20 @@
+"""Shared setup for the gunicorn entry points (wsgi.py, wsgi2.py)
+
+The workers hold the dashboards' browser connections. The bot process must
+run with the same SOCKETIO_MESSAGE_QUEUE: it keeps serving /api (only it can
+reach the bot) and publishes its updates through the queue to every worker.
+Put a reverse proxy in front that sends /socket.io/ to the workers and
+everything else to the bot process's start_web_server() port.
+"""
+
+def worker_application(app, socketio, message_queue):
+    """Bind a dashboard's SocketIO to the message queue and return its WSGI app
+
+    Workers only hold browser connections; every update comes from the bot
+    process through the queue, so running without one is a mistake.
+    """
+    if not message_queue:
+        raise RuntimeError("Set SOCKETIO_MESSAGE_QUEUE so workers receive the bot's updates")
+
+    socketio.init_app(app, message_queue=message_queue)
+    return app
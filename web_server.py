@@ -1,46 +1,181 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
-from flask_socketio import SocketIO, emit
-from flask_cors import CORS
+from flask import Flask, render_template, request, send_from_directory
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
+from socketio import RedisManager
 import threading
+from functools import wraps, lru_cache
 import asyncio
 import os
+import traceback
+import itertools
+import uuid
+from collections import deque
 import time
 from datetime import datetime, timedelta, timezone  # <-- IMPORT TIMEZONE
-import json
+import orjson
 from bot import AudioSource, LoopMode  # <-- IMPORT BOT CLASSES
 
 app = Flask(__name__, static_folder='template', template_folder='template')
-CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# API bodies only carry a few keys; refuse anything bigger up front
+app.config['MAX_CONTENT_LENGTH'] = 4096
+
+# The dashboard API is open to any origin, so the CORS headers never vary
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET,POST',
+    'Access-Control-Allow-Headers': 'Content-Type'
+}
+
+@app.before_request
+def answer_preflight():
+    """Answer every CORS preflight; add_cors_headers() fills in the headers"""
+    if request.method == 'OPTIONS':
+        return app.response_class(status=204)
+
+@app.after_request
+def add_cors_headers(response):
+    response.headers.update(CORS_HEADERS)
+    return response
+
+# eventlet gives clients a real WebSocket transport instead of long-polling.
+# We deliberately don't call eventlet.monkey_patch(): the bot's asyncio loop
+# shares this process and needs the stock socket/select/threading modules.
+# The server runs on its own OS thread, which gets its own eventlet hub.
+# Bound to the app by start_web_server() or, under gunicorn, by wsgi.py.
+socketio = SocketIO(cors_allowed_origins="*", async_mode='eventlet')
+
+# Set to e.g. redis://localhost:6379/0 to serve dashboard clients from
+# gunicorn workers (see wsgi.py) instead of from the bot process
+SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+
+def ojsonify(obj, status=200):
+    """jsonify() replacement backed by orjson's C encoder"""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
+def request_body():
+    """The request's JSON object; {} for a missing, malformed or non-object body"""
+    data = request.get_json(silent=True, cache=True)
+    return data if isinstance(data, dict) else {}
+
+# Bodies of the error responses that never change, encoded once at import.
+# Each request still gets its own Response, since after_request hooks
+# modify the one they're given.
+ERR_BOT_NOT_INIT = (orjson.dumps({'error': 'Bot not initialized'}), 503)
+ERR_INVALID_GUILD = (orjson.dumps({'error': 'Invalid guild_id'}), 400)
+ERR_MISSING_GUILD = (orjson.dumps({'error': 'Invalid or missing guild_id'}), 400)
+ERR_NO_SESSION = (orjson.dumps({'error': 'No active session'}), 404)
+
+def _err(error):
+    """Response for one of the prebuilt ERR_* bodies"""
+    body, status = error
+    return app.response_class(body, status=status, mimetype='application/json')
 
 # Global bot instance
 bot_instance = None
+# The bot's asyncio loop; every coroutine from the web layer runs here
+BOT_LOOP = None
+
+# Serialized snapshots so N dashboards polling at once cost one rebuild
+STATUS_CACHE_TTL = 1.0  # seconds
+GUILDS_CACHE_TTL = 5.0  # guild membership changes rarely
+_status_cache = {'body': None, 'ts': 0.0}
+_guilds_cache = {'body': None, 'ts': 0.0}
+
+# Status payload and per-guild rows, refilled in place on every rebuild
+# instead of allocating fresh dicts each time
+_status_payload = {'online': True, 'servers': 0, 'sessions': 0, 'uptime': '0h 0m', 'latency': 0, 'sessions_data': []}
+_session_rows = {}
+
+# Guild list as parallel columns (ids, id strings, guild objects). Names and
+# member counts can change without a listener firing, so /api/guilds reads
+# them live from the guild objects.
+# Rebuilt only when the bot's guilds change, and swapped in with a single
+# assignment so readers on the server thread always see a consistent set.
+_guild_index = ((), (), ())
+
+# Guilds whose session changed on the bot's thread. The bot can't emit
+# directly because Socket.IO state belongs to the server's eventlet hub,
+# so push_session_changes() drains this set from the server thread.
+_changed_guilds = set()
+_changed_lock = threading.Lock()
+# Events raised on the bot's thread (e.g. finished jobs) wait here for the
+# push task for the same reason
+_pending_emits = deque()
+PUSH_INTERVAL = 0.05  # seconds between checks for pending pushes
+_broadcaster_started = False
+HEARTBEAT_INTERVAL = 30  # full snapshot for clients that missed a push
 
 def start_web_server(bot, host='0.0.0.0', port=5000):
     """Start the web server in a separate thread"""
-    global bot_instance
+    global bot_instance, BOT_LOOP
     bot_instance = bot
+    BOT_LOOP = bot.loop
+    bot.session_manager.on_state_change = mark_session_changed
+    bot.session_manager.on_queue_change = mark_session_changed
+    for event in ('on_ready', 'on_guild_join', 'on_guild_remove', 'on_guild_update'):
+        bot.add_listener(on_guilds_changed, event)
+    if bot.is_ready():
+        # Started after on_ready (e.g. from it, or on a restart)
+        rebuild_guild_index()
+    
+    if SOCKETIO_MESSAGE_QUEUE:
+        # Clients are connected to the gunicorn workers (socketio_worker.py),
+        # so this process only publishes its emits. Write-only also keeps the
+        # queue's blocking listener off our unpatched eventlet hub.
+        socketio.init_app(app, client_manager=RedisManager(SOCKETIO_MESSAGE_QUEUE, write_only=True))
+    else:
+        socketio.init_app(app)
     
     def run():
+        # Background tasks must be spawned from this thread so they share
+        # the server's eventlet hub
+        start_status_broadcaster()
         socketio.run(app, host=host, port=port, debug=False, use_reloader=False)
     
     thread = threading.Thread(target=run, daemon=True)
     thread.start()
     print(f"îžå€¹ Web dashboard started: http://{host}:{port}")
 
-def run_async(coro):
-    """Helper to run async functions from sync context"""
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    if loop.is_running():
-        # Give more time for downloading
-        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout=60)
-    else:
-        return loop.run_until_complete(coro)
+def rebuild_guild_index():
+    """Snapshot the bot's guilds into _guild_index"""
+    global _guild_index
+    guilds = bot_instance.guilds
+    _guild_index = (
+        [guild.id for guild in guilds],
+        [str(guild.id) for guild in guilds], # Send ID as string
+        list(guilds)
+    )
+    _guilds_cache['ts'] = 0.0
+
+async def on_guilds_changed(*args):
+    """Bot event listener: keep the guild index current"""
+    rebuild_guild_index()
+
+def run_async_job(coro, event, guild_id, result_key, sid=None):
+    """Schedule a coroutine on the bot's loop without waiting for it
+    
+    Returns a job id at once. When the coroutine finishes, `event` is emitted
+    with that job id and either the coroutine's result (under `result_key`)
+    or the error. It goes to the guild's room and, if given, to the Socket.IO
+    client `sid`, so a caller that hasn't joined the room still hears back.
+    Callers without a Socket.IO connection (e.g. the extension) only get the
+    job id.
+    """
+    job_id = uuid.uuid4().hex
+    to = [guild_room(guild_id), sid] if sid else guild_room(guild_id)
+    
+    def done(future):
+        error = 'Cancelled' if future.cancelled() else future.exception()
+        if error:
+            print(f"Error in {event} job {job_id}: {error}")
+        emit_from_bot_thread(event, {
+            'job_id': job_id,
+            'guild_id': str(guild_id),
+            result_key: None if error else future.result(),
+            'error': str(error) if error else None
+        }, to)
+    
+    asyncio.run_coroutine_threadsafe(coro, BOT_LOOP).add_done_callback(done)
+    return job_id
 
 # ================== Web Routes ==================
 @app.route('/')
@@ -54,158 +189,184 @@ def index():
         return "Template not found. Make sure 'dashboard.html' is in the 'template' folder.", 404
 
 
+def build_session_row(guild, session):
+    """Build one guild's entry in sessions_data
+    
+    The row dict is reused between calls, so encode it before yielding.
+    """
+    row = _session_rows.get(guild.id)
+    if row is None:
+        row = _session_rows[guild.id] = {'guild_id': session._guild_id_str} # Send ID as string
+    
+    row['guild_name'] = guild.name
+    row['current_song'] = None
+    row['queue_size'] = len(session.queue)
+    row['is_playing'], row['is_paused'] = session.playback_state
+    row['volume'] = int(session.volume * 100)
+    row['loop_mode'] = session.loop_mode.value
+    row['radio_mode'] = session.radio_mode
+    row['state'] = session.state.value
+    
+    if session.current and not session.is_bg_playing: # Don't show BG music as current song
+        row['current_song'] = session.current.as_dict()
+    
+    return row
+
+def build_status_payload():
+    """Build the full status snapshot shared by /api/status and the broadcaster
+    
+    Like build_session_row(), this refills the same dict every time.
+    """
+    sessions = bot_instance.session_manager.sessions
+    
+    # Get all active sessions
+    sessions_data = _status_payload['sessions_data']
+    sessions_data.clear()
+    for guild_id, session in sessions.items():
+        guild = bot_instance.get_guild(guild_id)
+        if guild:
+            sessions_data.append(build_session_row(guild, session))
+    
+    # Forget rows of sessions that have ended
+    if len(_session_rows) > len(sessions):
+        for guild_id in [g for g in _session_rows if g not in sessions]:
+            del _session_rows[guild_id]
+    
+    # Fix: Use timezone-aware datetime for correct uptime calculation
+    uptime = datetime.now(timezone.utc) - bot_instance.start_time
+    hours, remainder = divmod(int(uptime.total_seconds()), 3600)
+    minutes, _ = divmod(remainder, 60)
+    
+    _status_payload['servers'] = len(_guild_index[0])
+    _status_payload['sessions'] = len(sessions)
+    _status_payload['uptime'] = f"{hours}h {minutes}m"
+    _status_payload['latency'] = round(bot_instance.latency * 1000)
+    return _status_payload
+
+def cache_status(payload):
+    """Store a freshly built status snapshot for /api/status to reuse"""
+    _status_cache['body'] = orjson.dumps(payload)
+    _status_cache['ts'] = time.monotonic()
+
+def cached_json(cache, ttl):
+    """Return a JSON response from cache if it's younger than ttl, else None"""
+    if cache['body'] is not None and time.monotonic() - cache['ts'] < ttl:
+        return app.response_class(cache['body'], mimetype='application/json')
+    return None
+
 @app.route('/api/status')
 def get_status():
     """Get bot status and statistics"""
     if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
+        return _err(ERR_BOT_NOT_INIT)
+    
+    cached = cached_json(_status_cache, STATUS_CACHE_TTL)
+    if cached is not None:
+        return cached
     
     try:
-        # Get all active sessions
-        sessions_data = []
-        for guild_id, session in bot_instance.session_manager.sessions.items():
-            guild = bot_instance.get_guild(guild_id)
-            if guild:
-                session_info = {
-                    'guild_id': str(guild_id), # Send ID as string
-                    'guild_name': guild.name,
-                    'current_song': None,
-                    'queue_size': len(session.queue),
-                    'is_playing': session.voice_client.is_playing() if session.voice_client else False,
-                    'is_paused': session.voice_client.is_paused() if session.voice_client else False,
-                    'volume': int(session.volume * 100),
-                    'loop_mode': session.loop_mode.value,
-                    'radio_mode': session.radio_mode,
-                    'state': session.state.value
-                }
-                
-                if session.current and not session.is_bg_playing: # Don't show BG music as current song
-                    session_info['current_song'] = {
-                        'title': session.current.title,
-                        'url': session.current.url,
-                        'uploader': session.current.uploader,
-                        'duration': session.current.duration,
-                        'thumbnail': session.current.thumbnail
-                    }
-                
-                sessions_data.append(session_info)
-        
-        # Fix: Use timezone-aware datetime for correct uptime calculation
-        uptime = datetime.now(timezone.utc) - bot_instance.start_time
-        hours, remainder = divmod(int(uptime.total_seconds()), 3600)
-        minutes, _ = divmod(remainder, 60)
-        
-        return jsonify({
-            'online': True,
-            'servers': len(bot_instance.guilds),
-            'sessions': len(bot_instance.session_manager.sessions),
-            'uptime': f"{hours}h {minutes}m",
-            'latency': round(bot_instance.latency * 1000),
-            'sessions_data': sessions_data
-        })
+        cache_status(build_status_payload())
+        return app.response_class(_status_cache['body'], mimetype='application/json')
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}, 500)
 
 @app.route('/api/guilds')
 def get_guilds():
     """Get list of guilds bot is in"""
     if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
+        return _err(ERR_BOT_NOT_INIT)
+    
+    cached = cached_json(_guilds_cache, GUILDS_CACHE_TTL)
+    if cached is not None:
+        return cached
     
     try:
-        guilds = []
-        for guild in bot_instance.guilds:
-            session = bot_instance.session_manager.get_session(guild.id)
-            guilds.append({
-                'id': str(guild.id), # Send ID as string
-                'name': guild.name,
-                'has_session': session is not None,
-                'member_count': guild.member_count
-            })
-        return jsonify({'guilds': guilds})
+        ids, ids_str, guild_objs = _guild_index
+        sessions = bot_instance.session_manager.sessions
+        guilds = [
+            {'id': guild_id_str, 'name': guild.name, 'has_session': guild_id in sessions, 'member_count': guild.member_count}
+            for guild_id, guild_id_str, guild in zip(ids, ids_str, guild_objs)
+        ]
+        _guilds_cache['body'] = orjson.dumps({'guilds': guilds})
+        _guilds_cache['ts'] = time.monotonic()
+        return app.response_class(_guilds_cache['body'], mimetype='application/json')
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}, 500)
 
 @app.route('/api/session/<guild_id_str>') # Accept string
 def get_session(guild_id_str):
     """Get detailed session info for a guild"""
     if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
+        return _err(ERR_BOT_NOT_INIT)
     
     try:
         guild_id = int(guild_id_str) # Fix: Convert to int
     except ValueError:
-        return jsonify({'error': 'Invalid guild_id'}), 400
+        return _err(ERR_INVALID_GUILD)
         
     session = bot_instance.session_manager.get_session(guild_id)
     if not session:
-        return jsonify({'error': 'No active session'}), 404
+        return _err(ERR_NO_SESSION)
     
     try:
-        queue_list = []
-        for i, song in enumerate(list(session.queue)[:20]):
-            queue_list.append({
-                'position': i + 1,
-                'title': song.title,
-                'url': song.url,
-                'uploader': song.uploader,
-                'duration': song.duration,
-                'is_downloaded': song.is_downloaded
-            })
+        is_playing, is_paused = session.playback_state
+        queue_list = [
+            {'position': i + 1, **song.as_dict(), 'is_downloaded': song.is_downloaded}
+            for i, song in enumerate(itertools.islice(session.queue, 20))
+        ]
         
         current_song_data = None
         if session.current and not session.is_bg_playing:
-             current_song_data = {
-                'title': session.current.title,
-                'url': session.current.url,
-                'uploader': session.current.uploader,
-                'duration': session.current.duration,
-                'thumbnail': session.current.thumbnail
-            }
-
-        return jsonify({
+            current_song_data = session.current.as_dict()
+
+        return ojsonify({
             'current_song': current_song_data,
             'queue': queue_list,
             'queue_size': len(session.queue),
             'volume': int(session.volume * 100),
             'loop_mode': session.loop_mode.value,
             'radio_mode': session.radio_mode,
-            'is_playing': session.voice_client.is_playing() if session.voice_client else False,
-            'is_paused': session.voice_client.is_paused() if session.voice_client else False,
+            'is_playing': is_playing,
+            'is_paused': is_paused,
             'state': session.state.value
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}, 500)
 
 # ================== Control API ==================
 @app.route('/api/play', methods=['POST'])
 def play_music():
-    """Play a song"""
+    """Play a song
+    
+    Answers 202 with a job id; the outcome follows as a 'play_complete'
+    event. Send the Socket.IO 'sid' along to receive it without joining
+    the guild's room.
+    """
     if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
+        return _err(ERR_BOT_NOT_INIT)
     
-    data = request.json
+    data = request_body()
     guild_id_str = data.get('guild_id')
     search = data.get('search')
     
     if not guild_id_str or not search:
-        return jsonify({'error': 'Missing guild_id or search'}), 400
+        return ojsonify({'error': 'Missing guild_id or search'}, 400)
     
     try:
         guild_id = int(guild_id_str) # Fix: Convert to int
-    except ValueError:
-        return jsonify({'error': 'Invalid guild_id'}), 400
+    except (ValueError, TypeError):
+        return _err(ERR_INVALID_GUILD)
     
     session = bot_instance.session_manager.get_session(guild_id)
     if not session:
-        return jsonify({'error': 'No active session. Use /join first'}), 404
+        return ojsonify({'error': 'No active session. Use /join first'}, 404)
     
     try:
         # Fix: Implement the async logic
         async def add_to_queue():
             loop = bot_instance.loop
             # Use session.ctx for error reporting if available, else None
-            ctx = session.ctx if hasattr(session, 'ctx') else None 
+            ctx = getattr(session, 'ctx', None)
             
             sources = await AudioSource.create_source(ctx, search, loop=loop, download=True)
             
@@ -218,282 +379,158 @@ def play_music():
             added = await session.add_songs(sources)
             return len(added)
 
-        # Use the run_async helper to execute the coroutine
-        added_count = run_async(add_to_queue())
-        
-        if added_count > 0:
-            socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'played'})
-            return jsonify({'success': True, 'message': f'Added {added_count} song(s): {search}'})
-        else:
-            return jsonify({'error': 'No songs found or added'}), 404
+        # Downloading can take a while, so answer now and report the
+        # outcome through a 'play_complete' event carrying this job id
+        job_id = run_async_job(add_to_queue(), 'play_complete', guild_id, 'added', data.get('sid'))
+        return ojsonify({'success': True, 'job_id': job_id, 'message': f'Searching: {search}'}, 202)
     
     except Exception as e:
         print(f"Error in /api/play: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        if app.debug:
+            traceback.print_exc()
+        return ojsonify({'error': str(e)}, 500)
 
 
+@lru_cache(maxsize=16)
+def _loop_mode(mode):
+    """LoopMode(mode), memoized for the handful of valid mode strings"""
+    return LoopMode(mode)
+
+def with_session(fn):
+    """Resolve the request's guild_id to its session and pass both to fn"""
+    @wraps(fn)
+    def wrapper():
+        if not bot_instance:
+            return _err(ERR_BOT_NOT_INIT)
+        
+        data = request_body()
+        try:
+            guild_id = int(data['guild_id'])
+        except (KeyError, TypeError, ValueError):
+            return _err(ERR_MISSING_GUILD)
+        
+        session = bot_instance.session_manager.get_session(guild_id)
+        if not session:
+            return _err(ERR_NO_SESSION)
+        
+        try:
+            return fn(session, guild_id, data)
+        except Exception as e:
+            return ojsonify({'error': str(e)}, 500)
+    return wrapper
+
 @app.route('/api/pause', methods=['POST'])
-def pause_music():
+@with_session
+def pause_music(session, guild_id, data):
     """Pause playback"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.pause()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'paused'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    session.pause()
+    socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'paused'}, to=guild_room(guild_id))
+    return ojsonify({'success': True})
 
 @app.route('/api/resume', methods=['POST'])
-def resume_music():
+@with_session
+def resume_music(session, guild_id, data):
     """Resume playback"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.resume()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'resumed'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    session.resume()
+    socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'resumed'}, to=guild_room(guild_id))
+    return ojsonify({'success': True})
 
 @app.route('/api/skip', methods=['POST'])
-def skip_song():
+@with_session
+def skip_song(session, guild_id, data):
     """Skip current song"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        if not session.current and not session.is_bg_playing:
-             return jsonify({'error': 'Nothing to skip'}), 404
+    if not session.current and not session.is_bg_playing:
+         return ojsonify({'error': 'Nothing to skip'}, 404)
 
-        session.skip() # This works for both regular songs and BG music
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'skipped'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    session.skip() # This works for both regular songs and BG music
+    socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'skipped'}, to=guild_room(guild_id))
+    return ojsonify({'success': True})
 
 @app.route('/api/stop', methods=['POST'])
-def stop_music():
+@with_session
+def stop_music(session, guild_id, data):
     """Stop playback and clear queue"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.clear_queue()
-        if session.voice_client and session.voice_client.is_playing():
-            session.voice_client.stop()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'stopped'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    session.clear_queue()
+    if session.voice_client and session.voice_client.is_playing():
+        session.voice_client.stop()
+    socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'stopped'}, to=guild_room(guild_id))
+    return ojsonify({'success': True})
 
 @app.route('/api/volume', methods=['POST'])
-def set_volume():
+@with_session
+def set_volume(session, guild_id, data):
     """Set volume"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
     try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
         volume = int(data.get('volume'))
     except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id/volume'}), 400
-    
-    if volume is None:
-        return jsonify({'error': 'Missing volume'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
+        return ojsonify({'error': 'Invalid or missing volume'}, 400)
     
-    try:
-        session.set_volume(volume / 100)
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'volume_changed', 'volume': volume})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    session.set_volume(volume / 100)
+    socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'volume_changed', 'volume': volume}, to=guild_room(guild_id))
+    return ojsonify({'success': True})
 
 @app.route('/api/loop', methods=['POST'])
-def set_loop():
+@with_session
+def set_loop(session, guild_id, data):
     """Set loop mode"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
     mode = data.get('mode')
-    try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-
     if not mode:
-        return jsonify({'error': 'Missing loop mode'}), 400
-        
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
+        return ojsonify({'error': 'Missing loop mode'}, 400)
     
     try:
-        session.loop_mode = LoopMode(mode)
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'loop_changed', 'mode': mode})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        # Unhashable modes (lists, objects) make the lru_cache raise TypeError
+        session.loop_mode = _loop_mode(mode)
+    except (ValueError, TypeError):
+        return ojsonify({'error': f'Invalid loop mode: {mode}'}, 400)
+    socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'loop_changed', 'mode': mode}, to=guild_room(guild_id))
+    return ojsonify({'success': True})
 
 @app.route('/api/shuffle', methods=['POST'])
-def shuffle_queue():
+@with_session
+def shuffle_queue(session, guild_id, data):
     """Shuffle queue"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.shuffle()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'shuffled'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    session.shuffle()
+    socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'shuffled'}, to=guild_room(guild_id))
+    return ojsonify({'success': True})
 
 @app.route('/api/clear', methods=['POST'])
-def clear_queue():
+@with_session
+def clear_queue(session, guild_id, data):
     """Clear queue"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.clear_queue()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'cleared'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    session.clear_queue()
+    socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'cleared'}, to=guild_room(guild_id))
+    return ojsonify({'success': True})
 
 @app.route('/api/radio', methods=['POST'])
-def toggle_radio():
+@with_session
+def toggle_radio(session, guild_id, data):
     """Toggle radio mode"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        if session.radio_mode:
-            session.disable_radio_mode()
-            action = 'radio_disabled'
-            msg = 'Radio disabled'
-        else:
-            if session.current and not session.is_bg_playing:
-                # Use run_async helper
-                async def enable_radio():
-                    await session.enable_radio_mode(session.current.video_id)
-                run_async(enable_radio())
-                action = 'radio_enabled'
-                msg = 'Radio enabled'
-            else:
-                return jsonify({'error': 'Play a song first to start radio'}), 400
-        
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': action})
-        return jsonify({'success': True, 'message': msg})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    if session.radio_mode:
+        session.disable_radio_mode()
+        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'radio_disabled'}, to=guild_room(guild_id))
+        return ojsonify({'success': True, 'message': 'Radio disabled'})
+    
+    if not session.current or session.is_bg_playing:
+        return ojsonify({'error': 'Play a song first to start radio'}, 400)
+    
+    # Reported through a 'radio_complete' event, like /api/play
+    async def enable_radio():
+        await session.enable_radio_mode(session.current.video_id)
+        return True
+    job_id = run_async_job(enable_radio(), 'radio_complete', guild_id, 'enabled', data.get('sid'))
+    return ojsonify({'success': True, 'job_id': job_id, 'message': 'Enabling radio'}, 202)
 
 @app.route('/api/crossfade', methods=['POST'])
-def toggle_crossfade():
+@with_session
+def toggle_crossfade(session, guild_id, data):
     """Toggle crossfade"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id')) # Fix: Convert to int
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.crossfade_enabled = not session.crossfade_enabled
-        socketio.emit('status_update', {
-            'guild_id': str(guild_id), 
-            'action': 'crossfade_toggled',
-            'enabled': session.crossfade_enabled
-        })
-        return jsonify({'success': True, 'enabled': session.crossfade_enabled})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    session.crossfade_enabled = not session.crossfade_enabled
+    socketio.emit('status_update', {
+        'guild_id': str(guild_id), 
+        'action': 'crossfade_toggled',
+        'enabled': session.crossfade_enabled
+    }, to=guild_room(guild_id))
+    return ojsonify({'success': True, 'enabled': session.crossfade_enabled})
 
 # ================== WebSocket Events ==================
 @socketio.on('connect')
@@ -518,10 +555,10 @@ def handle_status_request():
                 guild = bot_instance.get_guild(guild_id)
                 if guild:
                     session_info = {
-                        'guild_id': str(guild_id),
+                        'guild_id': session._guild_id_str,
                         'guild_name': guild.name,
                         'queue_size': len(session.queue),
-                        'is_playing': session.voice_client.is_playing() if session.voice_client else False,
+                        'is_playing': session.playback_state[0],
                         'volume': int(session.volume * 100)
                     }
                     if session.current and not session.is_bg_playing:
@@ -530,45 +567,100 @@ def handle_status_request():
             
             emit('status_update', {
                 'online': True,
-                'servers': len(bot_instance.guilds),
+                'servers': len(_guild_index[0]),
                 'sessions': len(bot_instance.session_manager.sessions),
                 'sessions_data': sessions_data
             })
         except Exception as e:
             emit('error', {'message': str(e)})
 
+@socketio.on('join_guild')
+def handle_join_guild(data):
+    """Subscribe the client to pushes for the guild it has selected"""
+    for room in rooms():
+        if room.startswith('guild:'):
+            leave_room(room)
+    
+    guild_id = (data or {}).get('guild_id')
+    if guild_id:
+        join_room(guild_room(guild_id))
+
+def guild_room(guild_id):
+    """Socket.IO room that receives one guild's updates"""
+    return f'guild:{guild_id}'
+
+def mark_session_changed(session):
+    """Session hook: queue a push for the session's guild (any thread)"""
+    with _changed_lock:
+        _changed_guilds.add(session.guild_id)
+
+def emit_from_bot_thread(event, data, room):
+    """Queue a Socket.IO emit from outside the server thread"""
+    _pending_emits.append((event, data, room))
+
+def flush_pending_emits():
+    """Send the emits queued by emit_from_bot_thread()"""
+    while _pending_emits:
+        event, data, room = _pending_emits.popleft()
+        socketio.emit(event, data, to=room)
+
+def push_session_changes():
+    """Emit the new state of each changed guild to that guild's room"""
+    if not _changed_guilds:
+        return
+    
+    with _changed_lock:
+        changed = list(_changed_guilds)
+        _changed_guilds.clear()
+    
+    # The shared snapshot is stale now
+    _status_cache['ts'] = 0.0
+    
+    sessions = bot_instance.session_manager.sessions
+    for guild_id in changed:
+        session = sessions.get(guild_id)
+        guild = bot_instance.get_guild(guild_id)
+        rows = [build_session_row(guild, session)] if session and guild else []
+        socketio.emit('status_update', {
+            'sessions': len(sessions),
+            'sessions_data': rows
+        }, to=guild_room(guild_id))
+
 def broadcast_status_update():
     """Broadcast status update to all connected clients"""
     if bot_instance:
         try:
-            sessions_data = []
-            for guild_id, session in bot_instance.session_manager.sessions.items():
-                guild = bot_instance.get_guild(guild_id)
-                if guild:
-                    sessions_data.append({
-                        'guild_id': str(guild_id),
-                        'guild_name': guild.name,
-                        'queue_size': len(session.queue)
-                    })
-            
-            socketio.emit('status_update', {
-                'servers': len(bot_instance.guilds),
-                'sessions': len(bot_instance.session_manager.sessions),
-                'sessions_data': sessions_data
-            })
+            payload = build_status_payload()
+            cache_status(payload)
+            socketio.emit('status_update', payload)
         except:
             pass
 
-# Start periodic status broadcasts
+# Start status pushes
 def start_status_broadcaster():
-    """Start background task to broadcast status updates"""
-    def broadcast():
+    """Start background tasks that push status updates to clients
+    
+    Only called from start_web_server(), never at import, and only once:
+    restarting the web server must not stack a second set of tasks.
+    """
+    global _broadcaster_started
+    if _broadcaster_started:
+        return
+    _broadcaster_started = True
+    
+    def push():
+        while True:
+            socketio.sleep(PUSH_INTERVAL)
+            try:
+                flush_pending_emits()
+                push_session_changes()
+            except Exception as e:
+                print(f"Error pushing session update: {e}")
+    
+    def heartbeat():
         while True:
-            time.sleep(5)  # Broadcast every 5 seconds
+            socketio.sleep(HEARTBEAT_INTERVAL)
             broadcast_status_update()
     
-    thread = threading.Thread(target=broadcast, daemon=True)
-    thread.start()
-
-# Start broadcaster when server starts
-start_status_broadcaster()
+    socketio.start_background_task(push)
+    socketio.start_background_task(heartbeat)
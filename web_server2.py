@@ -1,22 +1,106 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, send_from_directory
 from flask_socketio import SocketIO, emit
+from socketio import RedisManager
 from flask_cors import CORS
+from eventlet import tpool
 import threading
 import asyncio
 import os
 import time
-from datetime import datetime, timedelta, timezone
-import json
+import uuid
+import logging
+from itertools import count, islice
+from collections import deque
+from datetime import datetime, timezone
+import orjson
 from bot import AudioSource, LoopMode
 
+logger = logging.getLogger(__name__)
+
+class _OrjsonPackets:
+    """json module stand-in so Socket.IO packets are encoded by orjson"""
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__, static_folder='template', template_folder='template')
 # Explicitly apply CORS to the Flask app itself for REST endpoints (like /api/play)
 CORS(app, resources={r"/*": {"origins": "*"}})
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# Same eventlet setup as web_server.py (the no-monkey_patch rationale is
+# there); bound to the app by start_web_server() or by wsgi2.py
+socketio = SocketIO(cors_allowed_origins="*", async_mode='eventlet', json=_OrjsonPackets)
+
+# Set to e.g. redis://localhost:6379/0 to serve dashboard clients from
+# gunicorn workers (see wsgi2.py) instead of from the bot process
+SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+
+def ojson(obj, status=200):
+    """JSON response encoded by orjson (web_server.ojsonify's counterpart)"""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
+# Bodies of the error responses that never change, encoded once at import;
+# only errors that echo the request or an exception are built per call
+_ERR_NO_BOT = (orjson.dumps({'error': 'Bot not initialized'}), 503)
+_ERR_NO_SESSION = (orjson.dumps({'error': 'No active session'}), 404)
+_ERR_BAD_GID = (orjson.dumps({'error': 'Invalid or missing guild_id'}), 400)
+_ERR_NOTHING_PLAYING = (orjson.dumps({'error': 'Nothing is playing'}), 404)
+_ERR_BAD_VOLUME = (orjson.dumps({'error': 'Invalid or missing volume'}), 400)
+_ERR_NO_LOOP_MODE = (orjson.dumps({'error': 'Missing loop mode'}), 400)
+_ERR_BAD_LOOP_MODE = (orjson.dumps({'error': 'Invalid loop mode'}), 400)
+_ERR_NO_RADIO_SEED = (orjson.dumps({'error': 'Play a song first to start radio'}), 400)
+# /api/play also answers with 'status' and 'message' for the extension
+_ERR_PLAY_NO_BOT = (orjson.dumps({'status': 'error', 'error': 'Bot not initialized', 'message': 'Bot not initialized'}), 503)
+_ERR_PLAY_MISSING = (orjson.dumps({'status': 'error', 'error': 'Missing guild_id or query/search', 'message': 'Missing guild_id or query'}), 400)
+_ERR_PLAY_BAD_GID = (orjson.dumps({'status': 'error', 'error': 'Invalid guild_id format. Must be a number.', 'message': 'Invalid guild_id format. Must be a number.'}), 400)
+_ERR_PLAY_NO_CHANNEL = (orjson.dumps({'status': 'error', 'error': 'Guild has no text channels', 'message': 'Guild has no text channels to send response/join status.'}), 400)
+
+def _err(error):
+    """Fresh response around a prebuilt (body, status) pair"""
+    body, status = error
+    return app.response_class(body, status=status, mimetype='application/json')
+
+class _MockContext:
+    """Stand-in for a command Context when /api/play has to start a session"""
+    __slots__ = ('guild', 'channel')
+    
+    def __init__(self, guild, channel):
+        self.guild = guild
+        self.channel = channel
+
+# Loop modes by the value the dashboard sends
+_LOOP_MODES = {m.value: m for m in LoopMode}
 
 # Global bot instance
 bot_instance = None
 
+# Set by control endpoints after a change; the broadcaster coalesces every
+# change made within one tick into a single status_update
+_pending_broadcast = threading.Event()
+# Job results raised on the bot's thread wait here for the broadcaster
+_pending_emits = deque()
+BROADCAST_TICK = 0.2  # seconds
+BROADCAST_MAX_INTERVAL = 5  # send a snapshot at least this often
+
+# Bumped on every session change, from control endpoints or from the bot's
+# own session hooks; the status snapshots below are only rebuilt when it moves.
+# Drawn from a count() so bumps racing on both threads still move it.
+_state_versions = count(1)
+_state_version = 0
+# Some changes never bump it (e.g. a guild rename), so the snapshots also
+# expire after STATUS_CACHE_TTL
+STATUS_CACHE_TTL = 5.0  # seconds
+_status_cache = {'version': -1, 'ts': 0.0, 'rows': ()}
+_broadcast_cache = {'version': -1, 'ts': 0.0, 'payload': None}
+
+# Last formatted uptime and the monotonic time it was computed at; the
+# dashboard only shows minutes, so it needn't be recomputed per request
+UPTIME_CACHE_TTL = 30  # seconds
+_uptime_cache = [0, '']
+
 def start_web_server(bot, host='0.0.0.0', port=5000, use_ssl=False, cert_path=None, key_path=None):
     """
     Start the web server in a separate thread
@@ -43,44 +127,75 @@ def start_web_server(bot, host='0.0.0.0', port=5000, use_ssl=False, cert_path=No
     """
     global bot_instance
     bot_instance = bot
+    bot.session_manager.on_state_change = state_changed
+    bot.session_manager.on_queue_change = state_changed
+    
+    if SOCKETIO_MESSAGE_QUEUE:
+        # Publish-only; see socketio_worker.py for the worker layout
+        socketio.init_app(app, client_manager=RedisManager(SOCKETIO_MESSAGE_QUEUE, write_only=True))
+    else:
+        socketio.init_app(app)
     
     def run():
+        # On this thread's hub, as in web_server.start_web_server()
+        start_status_broadcaster()
+        
+        display_host = 'localhost' if host == '0.0.0.0' else host
         if use_ssl:
+            cert_exists = bool(cert_path) and os.path.exists(cert_path)
+            key_exists = bool(key_path) and os.path.exists(key_path)
             if not cert_path or not key_path:
-                print("âŒ SSL enabled but cert_path or key_path not provided!")
-                print("   Falling back to HTTP...")
+                logger.error("SSL enabled but cert_path or key_path not provided; falling back to HTTP")
                 socketio.run(app, host=host, port=port, debug=False, use_reloader=False)
-            elif not os.path.exists(cert_path) or not os.path.exists(key_path):
-                print(f"âŒ Certificate files not found!")
-                print(f"   cert_path: {cert_path} (exists: {os.path.exists(cert_path)})")
-                print(f"   key_path: {key_path} (exists: {os.path.exists(key_path)})")
-                print("   Falling back to HTTP...")
+            elif not cert_exists or not key_exists:
+                logger.error("Certificate files not found (cert_path: %s, exists: %s; key_path: %s, exists: %s); falling back to HTTP",
+                             cert_path, cert_exists, key_path, key_exists)
                 socketio.run(app, host=host, port=port, debug=False, use_reloader=False)
             else:
-                display_host = 'localhost' if host == '0.0.0.0' else host
-                print(f"âœ¦ Web dashboard started (HTTPS): https://{display_host}:{port}")
-                # For flask-socketio, SSL context needs to be passed differently
-                import ssl
-                ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-                ssl_context.load_cert_chain(cert_path, key_path)
+                logger.info("Web dashboard started (HTTPS): https://%s:%s", display_host, port)
+                # eventlet wraps the listening socket itself from these paths
                 socketio.run(
                     app, 
                     host=host, 
                     port=port, 
                     debug=False, 
                     use_reloader=False,
-                    ssl_context=ssl_context
+                    certfile=cert_path,
+                    keyfile=key_path
                 )
         else:
-            display_host = 'localhost' if host == '0.0.0.0' else host
-            print(f"âœ¦ Web dashboard started (HTTP): https://{display_host}:{port}")
+            logger.info("Web dashboard started (HTTP): http://%s:%s", display_host, port)
             socketio.run(app, host=host, port=port, debug=False, use_reloader=False)
     
     thread = threading.Thread(target=run, daemon=True)
     thread.start()
 
+def state_changed(*args):
+    """Record a session change (safe from any thread) and schedule a broadcast"""
+    global _state_version
+    _state_version = next(_state_versions)
+    _pending_broadcast.set()
+
+def _resolve(guild_id_str):
+    """Parse a guild_id and find its session with a single dict lookup.
+    Returns (session, None) or (None, error_response)"""
+    try:
+        guild_id = int(guild_id_str)
+    except (ValueError, TypeError):
+        return None, _err(_ERR_BAD_GID)
+    
+    session = bot_instance.session_manager.sessions.get(guild_id)
+    if not session:
+        return None, _err(_ERR_NO_SESSION)
+    return session, None
+
 def run_async(coro):
-    """Helper to run async functions from sync context using the bot's event loop"""
+    """Helper to run async functions from sync context using the bot's event loop
+    
+    Only for callers that need the result; prefer run_async_job(). The views
+    stay synchronous Flask views: the bot's loop can't also host an ASGI
+    server for them without giving up the eventlet Socket.IO server.
+    """
     if not bot_instance:
         raise RuntimeError("Bot instance not available")
     
@@ -90,13 +205,42 @@ def run_async(coro):
     # Create a future in the bot's event loop
     future = asyncio.run_coroutine_threadsafe(coro, loop)
     
-    # Wait for the result with a timeout
+    # Wait for the result with a timeout, in eventlet's thread pool so the
+    # server hub keeps serving other clients meanwhile
     try:
-        return future.result(timeout=60)
+        return tpool.execute(future.result, 60)
     except Exception as e:
-        print(f"Error in run_async: {e}")
+        logger.error("Error in run_async: %s", e)
         raise
 
+def run_async_job(coro, event, result_key, sid=None):
+    """Schedule a coroutine on the bot's loop without waiting for it
+    
+    Returns a job id at once. When the coroutine finishes, a status broadcast
+    is scheduled and, if the caller passed its Socket.IO `sid`, `event` is
+    sent to it with that job id and either the coroutine's result (under
+    `result_key`) or the error. Callers without a Socket.IO connection
+    (e.g. the extension) only get the job id.
+    """
+    job_id = uuid.uuid4().hex
+    
+    def done(future):
+        error = 'Cancelled' if future.cancelled() else future.exception()
+        if error:
+            logger.error("Error in %s job %s: %s", event, job_id, error)
+        if sid:
+            # Socket.IO state belongs to the server's hub; the broadcaster
+            # sends this on its next tick
+            _pending_emits.append((event, {
+                'job_id': job_id,
+                result_key: None if error else future.result(),
+                'error': str(error) if error else None
+            }, sid))
+        state_changed()
+    
+    asyncio.run_coroutine_threadsafe(coro, bot_instance.loop).add_done_callback(done)
+    return job_id
+
 # ================== Web Routes ==================
 @app.route('/')
 def index():
@@ -104,101 +248,127 @@ def index():
     try:
         return render_template('dashboard.html')
     except Exception as e:
-        print(f"Error rendering template: {e}")
+        logger.error("Error rendering template: %s", e)
         return "Template not found. Make sure 'dashboard.html' is in the 'template' folder.", 404
 
 
-@app.route('/api/status')
-def get_status():
-    """Get bot status and statistics"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    try:
-        # Get all active sessions
-        sessions_data = []
+def current_song_data(session):
+    """Dashboard view of the playing song; None while background music plays"""
+    current = session.current
+    if not current or session.is_bg_playing:
+        return None
+    return {
+        'title': current.title,
+        'url': current.url,
+        'uploader': current.uploader,
+        'duration': current.duration,
+        'thumbnail': current.thumbnail
+    }
+
+def cached_sessions_data():
+    """sessions_data for /api/status and request_status
+    
+    Rows are rebuilt after a state change or once STATUS_CACHE_TTL passes.
+    is_playing/is_paused are read live on every call, since a track ending
+    or the voice client dropping doesn't go through state_changed().
+    """
+    version = _state_version
+    now = time.monotonic()
+    if _status_cache['version'] != version or now - _status_cache['ts'] >= STATUS_CACHE_TTL:
+        rows = []
+        get_guild = bot_instance.get_guild
         for guild_id, session in bot_instance.session_manager.sessions.items():
-            guild = bot_instance.get_guild(guild_id)
+            guild = get_guild(guild_id)
             if guild:
-                session_info = {
+                rows.append((session, {
                     'guild_id': str(guild_id),
                     'guild_name': guild.name,
-                    'current_song': None,
+                    'current_song': current_song_data(session),
                     'queue_size': len(session.queue),
-                    'is_playing': session.voice_client.is_playing() if session.voice_client else False,
-                    'is_paused': session.voice_client.is_paused() if session.voice_client else False,
                     'volume': int(session.volume * 100),
                     'loop_mode': session.loop_mode.value,
                     'radio_mode': session.radio_mode,
                     'state': session.state.value
-                }
-                
-                if session.current and not session.is_bg_playing:
-                    session_info['current_song'] = {
-                        'title': session.current.title,
-                        'url': session.current.url,
-                        'uploader': session.current.uploader,
-                        'duration': session.current.duration,
-                        'thumbnail': session.current.thumbnail
-                    }
-                
-                sessions_data.append(session_info)
-        
+                }))
+        _status_cache['version'] = version
+        _status_cache['ts'] = now
+        _status_cache['rows'] = rows
+    
+    sessions_data = []
+    for session, row in _status_cache['rows']:
+        vc = session.voice_client
+        sessions_data.append({
+            **row,
+            'is_playing': bool(vc and vc.is_playing()),
+            'is_paused': bool(vc and vc.is_paused())
+        })
+    return sessions_data
+
+def formatted_uptime():
+    """Bot uptime as "Nh Mm", recomputed at most every UPTIME_CACHE_TTL seconds"""
+    now = time.monotonic()
+    if now - _uptime_cache[0] > UPTIME_CACHE_TTL or not _uptime_cache[1]:
         uptime = datetime.now(timezone.utc) - bot_instance.start_time
         hours, remainder = divmod(int(uptime.total_seconds()), 3600)
         minutes, _ = divmod(remainder, 60)
+        _uptime_cache[:] = [now, f"{hours}h {minutes}m"]
+    return _uptime_cache[1]
+
+@app.route('/api/status')
+def get_status():
+    """Get bot status and statistics"""
+    if not bot_instance:
+        return _err(_ERR_NO_BOT)
+    
+    try:
+        sessions_data = cached_sessions_data()
         
-        return jsonify({
+        return ojson({
             'online': True,
             'servers': len(bot_instance.guilds),
             'sessions': len(bot_instance.session_manager.sessions),
-            'uptime': f"{hours}h {minutes}m",
+            'uptime': formatted_uptime(),
             'latency': round(bot_instance.latency * 1000),
             'sessions_data': sessions_data
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 @app.route('/api/guilds')
 def get_guilds():
     """Get list of guilds bot is in"""
     if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
+        return _err(_ERR_NO_BOT)
     
     try:
         guilds = []
+        sessions = bot_instance.session_manager.sessions
         for guild in bot_instance.guilds:
-            session = bot_instance.session_manager.get_session(guild.id)
             guilds.append({
                 'id': str(guild.id),
                 'name': guild.name,
-                'has_session': session is not None,
+                'has_session': guild.id in sessions,
                 'member_count': guild.member_count
             })
-        return jsonify({'guilds': guilds})
+        return ojson({'guilds': guilds})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 @app.route('/api/session/<guild_id_str>')
 def get_session(guild_id_str):
     """Get detailed session info for a guild"""
     if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
+        return _err(_ERR_NO_BOT)
     
-    try:
-        guild_id = int(guild_id_str)
-    except ValueError:
-        return jsonify({'error': 'Invalid guild_id'}), 400
-        
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
+    session, error = _resolve(guild_id_str)
+    if error is not None:
+        return error
     
     try:
         queue_list = []
-        for i, song in enumerate(list(session.queue)[:20]):
+        for position, song in enumerate(islice(session.queue, 20), start=1):
             queue_list.append({
-                'position': i + 1,
+                'position': position,
                 'title': song.title,
                 'url': song.url,
                 'uploader': song.uploader,
@@ -206,29 +376,20 @@ def get_session(guild_id_str):
                 'is_downloaded': song.is_downloaded
             })
         
-        current_song_data = None
-        if session.current and not session.is_bg_playing:
-             current_song_data = {
-                'title': session.current.title,
-                'url': session.current.url,
-                'uploader': session.current.uploader,
-                'duration': session.current.duration,
-                'thumbnail': session.current.thumbnail
-            }
-
-        return jsonify({
-            'current_song': current_song_data,
+        vc = session.voice_client
+        return ojson({
+            'current_song': current_song_data(session),
             'queue': queue_list,
             'queue_size': len(session.queue),
             'volume': int(session.volume * 100),
             'loop_mode': session.loop_mode.value,
             'radio_mode': session.radio_mode,
-            'is_playing': session.voice_client.is_playing() if session.voice_client else False,
-            'is_paused': session.voice_client.is_paused() if session.voice_client else False,
+            'is_playing': bool(vc and vc.is_playing()),
+            'is_paused': bool(vc and vc.is_paused()),
             'state': session.state.value
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 # ================== Control API ==================
 @app.route('/api/play', methods=['POST'])
@@ -237,10 +398,13 @@ def play_music():
     Handles API request to play music. Used by the dashboard and the Chrome Extension.
     
     The Chrome Extension is expected to send 'guild_id' and 'query' (the URL).
-    The dashboard sends 'guild_id' and 'search'.
+    The dashboard sends 'guild_id' and 'search', plus its Socket.IO 'sid'.
+    
+    Answers 202 with a job id; callers that sent their sid get the outcome
+    as a 'play_complete' event.
     """
     if not bot_instance:
-        return jsonify({'status': 'error', 'error': 'Bot not initialized', 'message': 'Bot not initialized'}), 503
+        return _err(_ERR_PLAY_NO_BOT)
     
     data = request.get_json()
     guild_id_str = data.get('guild_id')
@@ -248,379 +412,194 @@ def play_music():
     search = data.get('query') or data.get('search')
     
     if not guild_id_str or not search:
-        return jsonify({'status': 'error', 'error': 'Missing guild_id or query/search', 'message': 'Missing guild_id or query'}), 400
+        return _err(_ERR_PLAY_MISSING)
     
     try:
         # Convert the string guild_id from the extension to an integer
         guild_id = int(guild_id_str)
-        guild = bot_instance.get_guild(guild_id)
-        
-        if not guild:
-            return jsonify({'status': 'error', 'error': f'Guild with ID {guild_id} not found', 'message': f'Guild with ID {guild_id} not found. Is the bot in that server?'}), 404
-        
-        session = bot_instance.session_manager.get_session(guild_id)
-        
+    except (ValueError, TypeError):
+        return _err(_ERR_PLAY_BAD_GID)
+    
+    guild = bot_instance.get_guild(guild_id)
+    if not guild:
+        return ojson({'status': 'error', 'error': f'Guild with ID {guild_id} not found', 'message': f'Guild with ID {guild_id} not found. Is the bot in that server?'}, 404)
+    
+    session = bot_instance.session_manager.sessions.get(guild_id)
+    
+    try:
         # If no session exists, try to create a mock context to join voice
         if not session:
-            # Mock Context object for the music_cog.play function
-            class MockContext:
-                def __init__(self, guild, channel):
-                    self.guild = guild
-                    self.channel = channel 
-
             # Find a suitable channel to respond in (e.g., the guild's default channel or the first text channel)
             channel = guild.text_channels[0] if guild.text_channels else None
 
             if not channel:
-                return jsonify({'status': 'error', 'error': 'Guild has no text channels', 'message': 'Guild has no text channels to send response/join status.'}), 400
-                
-            ctx = MockContext(guild, channel)
+                return _err(_ERR_PLAY_NO_CHANNEL)
 
-            # Run the async bot play command
-            run_async(bot_instance.music_cog.play(ctx, search))
-            
-            # After command executes, broadcast status update to all dashboard users
-            threading.Thread(target=broadcast_status_update, daemon=True).start()
+            # Run the async bot play command; the outcome follows as a
+            # 'play_complete' event carrying this job id
+            job_id = run_async_job(bot_instance.music_cog.play(_MockContext(guild, channel), search),
+                                   'play_complete', 'added', data.get('sid'))
 
-            return jsonify({'status': 'success', 'success': True, 'message': f'Successfully added {search} to queue for {guild.name}'})
+            return ojson({'status': 'accepted', 'success': True, 'job_id': job_id, 'message': f'Adding {search} to the queue for {guild.name}'}, 202)
         
         # If session exists, add to queue directly
-        try:
-            async def add_to_queue():
-                loop = bot_instance.loop
-                ctx = session.ctx if hasattr(session, 'ctx') else None 
-                
-                sources = await AudioSource.create_source(ctx, search, loop=loop, download=True)
-                
-                if not sources:
-                    return 0
-                
-                if session.radio_mode:
-                    session.disable_radio_mode()
-                
-                added = await session.add_songs(sources)
-                return len(added)
-
-            added_count = run_async(add_to_queue())
+        async def add_to_queue():
+            ctx = getattr(session, 'ctx', None)
             
-            if added_count > 0:
-                socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'played'})
-                return jsonify({'status': 'success', 'success': True, 'message': f'Added {added_count} song(s): {search}'})
-            else:
-                return jsonify({'status': 'error', 'error': 'No songs found or added', 'message': 'No songs found or added'}), 404
-        
-        except Exception as e:
-            print(f"Error in /api/play: {e}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({'status': 'error', 'error': str(e), 'message': str(e)}), 500
-
-    except ValueError:
-        return jsonify({'status': 'error', 'error': 'Invalid guild_id format. Must be a number.', 'message': 'Invalid guild_id format. Must be a number.'}), 400
-    except Exception as e:
-        print(f"Error processing play request: {e}")
-        return jsonify({'status': 'error', 'error': str(e), 'message': str(e)}), 500
-
-
-@app.route('/api/pause', methods=['POST'])
-def pause_music():
-    """Pause playback"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.pause()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'paused'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/resume', methods=['POST'])
-def resume_music():
-    """Resume playback"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.resume()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'resumed'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/skip', methods=['POST'])
-def skip_song():
-    """Skip current song or background music"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        # Check if there's anything playing (regular song or BG music)
-        if not session.voice_client or not session.voice_client.is_playing():
-            return jsonify({'error': 'Nothing is playing'}), 404
-
-        # Skip works for both regular songs and background music
-        session.skip()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'skipped'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/stop', methods=['POST'])
-def stop_music():
-    """Stop playback and clear queue"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.clear_queue()
-        if session.voice_client and session.voice_client.is_playing():
-            session.voice_client.stop()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'stopped'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/volume', methods=['POST'])
-def set_volume():
-    """Set volume"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id'))
-        volume = int(data.get('volume'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id/volume'}), 400
-    
-    if volume is None:
-        return jsonify({'error': 'Missing volume'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.set_volume(volume / 100)
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'volume_changed', 'volume': volume})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+            sources = await AudioSource.create_source(ctx, search, loop=bot_instance.loop, download=True)
+            
+            if not sources:
+                logger.warning("No songs found for /api/play query: %s", search)
+                return 0
+            
+            if session.radio_mode:
+                session.disable_radio_mode()
+            
+            added = await session.add_songs(sources)
+            return len(added)
 
-@app.route('/api/loop', methods=['POST'])
-def set_loop():
-    """Set loop mode"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    mode = data.get('mode')
-    try:
-        guild_id = int(data.get('guild_id'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
+        # Don't hold the request open while yt-dlp resolves the query; the
+        # outcome follows as a 'play_complete' event carrying this job id
+        job_id = run_async_job(add_to_queue(), 'play_complete', 'added', data.get('sid'))
+        return ojson({'status': 'accepted', 'success': True, 'job_id': job_id, 'message': f'Adding {search} to the queue'}, 202)
 
-    if not mode:
-        return jsonify({'error': 'Missing loop mode'}), 400
-        
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.loop_mode = LoopMode(mode)
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'loop_changed', 'mode': mode})
-        return jsonify({'success': True})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/shuffle', methods=['POST'])
-def shuffle_queue():
-    """Shuffle queue"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.shuffle()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'shuffled'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/clear', methods=['POST'])
-def clear_queue():
-    """Clear queue"""
-    if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
-    
-    data = request.json
-    try:
-        guild_id = int(data.get('guild_id'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
-    
-    try:
-        session.clear_queue()
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': 'cleared'})
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        logger.exception("Error processing play request")
+        return ojson({'status': 'error', 'error': str(e), 'message': str(e)}, 500)
 
 @app.route('/api/radio', methods=['POST'])
 def toggle_radio():
     """Toggle radio mode"""
     if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
+        return _err(_ERR_NO_BOT)
     
     data = request.json
-    try:
-        guild_id = int(data.get('guild_id'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
+    session, error = _resolve(data.get('guild_id'))
+    if error is not None:
+        return error
     
     try:
         if session.radio_mode:
             session.disable_radio_mode()
-            action = 'radio_disabled'
             msg = 'Radio disabled'
         else:
             if session.current and not session.is_bg_playing:
-                async def enable_radio():
-                    await session.enable_radio_mode(session.current.video_id)
-                run_async(enable_radio())
-                action = 'radio_enabled'
+                run_async(session.enable_radio_mode(session.current.video_id))
                 msg = 'Radio enabled'
             else:
-                return jsonify({'error': 'Play a song first to start radio'}), 400
+                return _err(_ERR_NO_RADIO_SEED)
         
-        socketio.emit('status_update', {'guild_id': str(guild_id), 'action': action})
-        return jsonify({'success': True, 'message': msg})
+        state_changed()
+        return ojson({'success': True, 'message': msg})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
+
+class _ActionError(Exception):
+    """Raised by a control action to reject the request before changing
+    anything; carries one of the prebuilt _ERR_* bodies"""
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+# Simple control actions, each served at /api/<name> by control_action()
+# below. Each takes the session and the request body and returns None for a
+# plain success or a dict to send back instead; it raises _ActionError to
+# reject the request.
+def _skip(session, data):
+    # Check if there's anything playing (regular song or BG music)
+    vc = session.voice_client
+    if not vc or not vc.is_playing():
+        raise _ActionError(_ERR_NOTHING_PLAYING)
+    
+    # Skip works for both regular songs and background music
+    session.skip()
+
+def _stop(session, data):
+    session.clear_queue()
+    vc = session.voice_client
+    if vc and vc.is_playing():
+        vc.stop()
+
+def _set_volume(session, data):
+    try:
+        volume = int(data.get('volume'))
+    except (ValueError, TypeError):
+        raise _ActionError(_ERR_BAD_VOLUME)
+    session.set_volume(volume / 100)
 
-@app.route('/api/crossfade', methods=['POST'])
-def toggle_crossfade():
-    """Toggle crossfade"""
+def _set_loop(session, data):
+    mode = data.get('mode')
+    if not mode:
+        raise _ActionError(_ERR_NO_LOOP_MODE)
+    
+    loop_mode = _LOOP_MODES.get(mode) if isinstance(mode, str) else None
+    if loop_mode is None:
+        raise _ActionError(_ERR_BAD_LOOP_MODE)
+    session.loop_mode = loop_mode
+
+def _toggle_crossfade(session, data):
+    session.crossfade_enabled = not session.crossfade_enabled
+    return {'success': True, 'enabled': session.crossfade_enabled}
+
+ACTIONS = {
+    'pause': lambda session, data: session.pause(),
+    'resume': lambda session, data: session.resume(),
+    'skip': _skip,
+    'stop': _stop,
+    'volume': _set_volume,
+    'loop': _set_loop,
+    'shuffle': lambda session, data: session.shuffle(),
+    'clear': lambda session, data: session.clear_queue(),
+    'crossfade': _toggle_crossfade,
+}
+
+def control_action(action):
+    """Pause, resume, skip, stop, volume, loop, shuffle, clear and crossfade"""
     if not bot_instance:
-        return jsonify({'error': 'Bot not initialized'}), 503
+        return _err(_ERR_NO_BOT)
     
     data = request.json
-    try:
-        guild_id = int(data.get('guild_id'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid or missing guild_id'}), 400
-    
-    session = bot_instance.session_manager.get_session(guild_id)
-    if not session:
-        return jsonify({'error': 'No active session'}), 404
+    session, error = _resolve(data.get('guild_id'))
+    if error is not None:
+        return error
     
     try:
-        session.crossfade_enabled = not session.crossfade_enabled
-        socketio.emit('status_update', {
-            'guild_id': str(guild_id), 
-            'action': 'crossfade_toggled',
-            'enabled': session.crossfade_enabled
-        })
-        return jsonify({'success': True, 'enabled': session.crossfade_enabled})
+        result = ACTIONS[action](session, data)
+    except _ActionError as e:
+        return _err(e.error)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
+    
+    state_changed()
+    return ojson(result or {'success': True})
+
+# One explicit rule per action, so other paths keep Flask's own 404/405
+for action in ACTIONS:
+    app.add_url_rule(f'/api/{action}', f'control_{action}', control_action,
+                     methods=['POST'], defaults={'action': action})
 
 # ================== WebSocket Events ==================
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
-    print('âœ¦ Client connected')
+    logger.debug('Client connected')
     emit('connected', {'message': 'Connected to bot'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    print('âœ¦ Client disconnected')
+    logger.debug('Client disconnected')
 
 @socketio.on('request_status')
 def handle_status_request():
     """Handle status request from client"""
     if bot_instance:
         try:
-            sessions_data = []
-            for guild_id, session in bot_instance.session_manager.sessions.items():
-                guild = bot_instance.get_guild(guild_id)
-                if guild:
-                    session_info = {
-                        'guild_id': str(guild_id),
-                        'guild_name': guild.name,
-                        'queue_size': len(session.queue),
-                        'is_playing': session.voice_client.is_playing() if session.voice_client else False,
-                        'volume': int(session.volume * 100)
-                    }
-                    if session.current and not session.is_bg_playing:
-                        session_info['current_song'] = session.current.title
-                    sessions_data.append(session_info)
-            
             emit('status_update', {
                 'online': True,
                 'servers': len(bot_instance.guilds),
                 'sessions': len(bot_instance.session_manager.sessions),
-                'sessions_data': sessions_data
+                'sessions_data': cached_sessions_data()
             })
         except Exception as e:
             emit('error', {'message': str(e)})
@@ -629,34 +608,60 @@ def broadcast_status_update():
     """Broadcast status update to all connected clients"""
     if bot_instance:
         try:
-            sessions_data = []
-            for guild_id, session in bot_instance.session_manager.sessions.items():
-                guild = bot_instance.get_guild(guild_id)
-                if guild:
-                    sessions_data.append({
-                        'guild_id': str(guild_id),
-                        'guild_name': guild.name,
-                        'queue_size': len(session.queue)
-                    })
+            version = _state_version
+            now = time.monotonic()
+            if _broadcast_cache['version'] != version or now - _broadcast_cache['ts'] >= STATUS_CACHE_TTL:
+                sessions_data = []
+                for guild_id, session in bot_instance.session_manager.sessions.items():
+                    guild = bot_instance.get_guild(guild_id)
+                    if guild:
+                        sessions_data.append({
+                            'guild_id': str(guild_id),
+                            'guild_name': guild.name,
+                            'queue_size': len(session.queue)
+                        })
+                
+                _broadcast_cache['payload'] = {
+                    'servers': 0,
+                    'sessions': len(bot_instance.session_manager.sessions),
+                    'sessions_data': sessions_data
+                }
+                _broadcast_cache['version'] = version
+                _broadcast_cache['ts'] = now
             
-            socketio.emit('status_update', {
-                'servers': len(bot_instance.guilds),
-                'sessions': len(bot_instance.session_manager.sessions),
-                'sessions_data': sessions_data
-            })
+            # Guild joins don't bump the version, so refresh the count
+            payload = _broadcast_cache['payload']
+            payload['servers'] = len(bot_instance.guilds)
+            socketio.emit('status_update', payload)
         except:
             pass
 
 # Start periodic status broadcasts
 def start_status_broadcaster():
-    """Start background task to broadcast status updates"""
+    """Start background task to broadcast status updates
+    
+    Runs as a green task on the server's hub, so it must be started from the
+    server thread and may only wait with socketio.sleep().
+    """
     def broadcast():
+        idle = 0.0
         while True:
-            time.sleep(5)
-            broadcast_status_update()
-    
-    thread = threading.Thread(target=broadcast, daemon=True)
-    thread.start()
-
-# Start broadcaster when server starts
-start_status_broadcaster()
+            socketio.sleep(BROADCAST_TICK)
+            idle += BROADCAST_TICK
+            # Nothing may escape: this task is the only sender of
+            # status_update and job results for the life of the process
+            while _pending_emits:
+                event, data, to = _pending_emits.popleft()
+                try:
+                    socketio.emit(event, data, to=to)
+                except Exception:
+                    logger.exception("Error sending %s", event)
+            if _pending_broadcast.is_set() or idle >= BROADCAST_MAX_INTERVAL:
+                _pending_broadcast.clear()
+                idle = 0.0
+                try:
+                    broadcast_status_update()
+                except Exception:
+                    logger.exception("Error broadcasting status")
+    
+    socketio.start_background_task(broadcast)
@@ -0,0 +1,9 @@
+"""gunicorn entry point for web_server's Socket.IO clients (see socketio_worker.py)
+
+    export SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0
+    gunicorn --worker-class eventlet -w 4 --bind 0.0.0.0:5001 wsgi:application
+"""
+from socketio_worker import worker_application
+from web_server import app, socketio, SOCKETIO_MESSAGE_QUEUE
+
+application = worker_application(app, socketio, SOCKETIO_MESSAGE_QUEUE)